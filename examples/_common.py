@@ -0,0 +1,42 @@
+"""Shared mesh construction for the example scripts."""
+
+import numpy as np
+import pyvista as pv
+
+
+def quad_centers(A):
+    """Cell centers of a structured quad grid: the mean of each cell's four corners."""
+    return (0.25 * (A[:-1, :-1] + A[1:, :-1] + A[:-1, 1:] + A[1:, 1:])).ravel()
+
+
+def make_quad_mesh(x, y, surface=None):
+    """Build a quad mesh on the x/y tensor grid with cell-center fields.
+
+    ``surface`` optionally maps ``(X, Y)`` to point heights; the mesh is flat
+    otherwise. Cell data ``x`` and ``y`` (and ``z`` for a surface) hold the
+    cell centers.
+    """
+    # Sparse coordinates broadcast to the full grid as read-only views, so
+    # the only dense allocation is the points array itself
+    shape = (len(y), len(x))
+    X, Y = np.meshgrid(x, y, sparse=True)
+    Z = 0.0 if surface is None else surface(X, Y)
+    X, Y, Z = (np.broadcast_to(A, shape) for A in (X, Y, Z))
+    points = np.empty(shape + (3,))
+    points[..., 0] = X
+    points[..., 1] = Y
+    points[..., 2] = Z
+
+    # Create structured grid
+    mesh = pv.StructuredGrid()
+    mesh.points = points.reshape(-1, 3)
+    mesh.dimensions = [len(x), len(y), 1]
+
+    # Compute cell centers analytically from the grid corners
+    mesh.cell_data["x"] = quad_centers(X)
+    mesh.cell_data["y"] = quad_centers(Y)
+    if surface is not None:
+        mesh.cell_data["z"] = quad_centers(Z)
+
+    # Convert to unstructured grid for .vtu saving
+    return mesh.cast_to_unstructured_grid()
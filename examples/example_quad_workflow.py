@@ -1,37 +1,22 @@
 """Example quad workflow: Create a 20x20 mesh with y from 0-5, z=x**2, assign glass ply tapering in y."""
 
 import numpy as np
-import pyvista as pv
 import logging
 from b3_drp.core.assign import assign_plies, load_config
 from b3_drp.core.plotting import plot_grid
+from _common import make_quad_mesh
 
 logging.basicConfig(level=logging.INFO)
 
+
 # Create a 20x20 mesh with y in [0,5], z = x**2
 n = 51
-x = np.linspace(0, 1, n)
-y = np.linspace(0, 5, n)
-X, Y = np.meshgrid(x, y)
-Z = X**2
-points = np.column_stack([X.ravel(), Y.ravel(), Z.ravel()])
-
-# Create structured grid
-mesh = pv.StructuredGrid()
-mesh.points = points
-mesh.dimensions = [n, n, 1]
-
-# Compute cell centers for x, y, z
-cell_centers = mesh.cell_centers()
-mesh.cell_data["x"] = cell_centers.points[:, 0]
-mesh.cell_data["y"] = cell_centers.points[:, 1]
-mesh.cell_data["z"] = cell_centers.points[:, 2]
-
-# Convert to unstructured grid for .vtu saving
-mesh = mesh.cast_to_unstructured_grid()
+mesh = make_quad_mesh(
+    np.linspace(0, 1, n), np.linspace(0, 5, n), surface=lambda X, Y: X**2
+)
 
 # Save initial mesh
-mesh.save("examples/quad_input.vtu")
+mesh.save("examples/quad_input.vtu", binary=True, compression="zlib")
 
 # Load config and matdb
 config = load_config("examples/config_quad.yaml")
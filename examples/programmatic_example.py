@@ -1,15 +1,16 @@
 """Programmatic example: Define everything in code, assign plies, and plot."""
 
 import numpy as np
-import pyvista as pv
 import json
 import logging
 from b3_drp.core.assign import assign_plies
 from b3_drp.core.models import Config, MatDB, Datum, Ply, Condition
 from b3_drp.core.plotting import plot_grid
+from _common import make_quad_mesh
 
 logging.basicConfig(level=logging.INFO)
 
+
 # Define datums
 te_offset = Datum(base="r", values=[[0, 0], [20, 0.1], [40, 0.2]])
 
@@ -50,23 +51,7 @@ with open("examples/prog_matdb.json", "w") as f:
     json.dump({"carbon": {"id": 1}, "glass": {"id": 2}}, f)
 
 # Create a 10x10 square mesh in [0,1]
-x = np.linspace(0, 1, 11)
-y = np.linspace(0, 1, 11)
-X, Y = np.meshgrid(x, y)
-points = np.column_stack([X.ravel(), Y.ravel(), np.zeros_like(X.ravel())])
-
-# Create structured grid
-mesh = pv.StructuredGrid()
-mesh.points = points
-mesh.dimensions = [11, 11, 1]
-
-# Compute cell centers for x, y
-cell_centers = mesh.cell_centers()
-mesh.cell_data["x"] = cell_centers.points[:, 0]
-mesh.cell_data["y"] = cell_centers.points[:, 1]
-
-# Convert to unstructured grid for .vtu saving
-mesh = mesh.cast_to_unstructured_grid()
+mesh = make_quad_mesh(np.linspace(0, 1, 11), np.linspace(0, 1, 11))
 
 # Add required fields (mock, constant for simplicity)
 n_cells = len(mesh.cell_data["x"])
@@ -75,7 +60,7 @@ mesh.cell_data["distance_from_le"] = np.full(n_cells, 2.0)
 mesh.cell_data["distance_from_te"] = np.full(n_cells, 0.2)
 mesh.cell_data["distance_from_web0"] = np.full(n_cells, 0.5)
 
-mesh.save("examples/prog_input.vtu")
+mesh.save("examples/prog_input.vtu", binary=True, compression="zlib")
 
 # Assign plies
 result_grid = assign_plies(
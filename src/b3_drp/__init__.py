@@ -1,7 +1,18 @@
 """b3_drp: Assign composite plies to FEA elements."""
 
-from .core.assign import assign_plies
-from .core.drp_step import DrapeStep
-
 __version__ = "0.1.0"
 __all__ = ["assign_plies", "DrapeStep"]
+
+
+def __getattr__(name):
+    # Import on first access so `b3_drp.__version__` and the CLI do not
+    # pull in pyvista/VTK and statesman up front.
+    if name == "assign_plies":
+        from .core.assign import assign_plies
+
+        return assign_plies
+    if name == "DrapeStep":
+        from .core.drp_step import DrapeStep
+
+        return DrapeStep
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
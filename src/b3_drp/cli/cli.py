@@ -1,17 +1,23 @@
 """CLI entry point using treeparse."""
 
 import logging
-from rich.logging import RichHandler
 from treeparse import cli, command, option
-from ..core.assign import assign_plies, load_config
-from ..core.plotting import plot_grid
-import pyvista as pv
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    handlers=[RichHandler(show_time=False)],
-)
+
+# Heavy dependencies (pyvista/VTK, rich) are imported inside the command
+# callbacks so that `b3_drp --help` and argument errors stay fast.
+
+
+def _setup_logging(verbose: bool = False) -> None:
+    """Configure rich logging on first use of a command."""
+    from rich.logging import RichHandler
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[RichHandler(show_time=False)],
+    )
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
 
 
 def drape_command(
@@ -22,8 +28,9 @@ def drape_command(
     verbose: bool = False,
 ) -> None:
     """Assign composite plies to FEA mesh."""
-    if verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    from ..core.assign import assign_plies, load_config
+
+    _setup_logging(verbose)
     config_data = load_config(lamplan)
     assign_plies(config_data, grid, matdb, output)
 
@@ -37,8 +44,10 @@ def plot_command(
     verbose: bool = False,
 ) -> None:
     """Plot the grid with scalar coloring."""
-    if verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    import pyvista as pv
+    from ..core.plotting import plot_grid
+
+    _setup_logging(verbose)
     grid_obj = pv.read(grid)
     plot_grid(
         grid_obj,
@@ -0,0 +1,148 @@
+"""Compiled per-ply condition and write-back kernels.
+
+Conditions are lowered once into flat opcode/operand arrays so a single
+pass over the cells evaluates the whole AND chain of a ply; a second
+kernel writes a ply's output arrays and summary sums in one pass. Numba is
+optional; without it the kernels still run as plain Python, and callers
+should prefer the NumPy paths in ``assign`` instead.
+"""
+
+from enum import IntEnum
+from typing import NamedTuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - exercised when numba is absent
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit``."""
+
+        def wrap(fn):
+            return fn
+
+        return wrap
+
+
+class Op(IntEnum):
+    """Condition opcodes understood by ``apply_ply``."""
+
+    IN_RANGE = 0
+    GT = 1
+    LT = 2
+    GT_DATUM = 3
+    LT_DATUM = 4
+
+
+class ConditionArrays(NamedTuple):
+    """Flat, kernel-ready encoding of one ply's conditions."""
+
+    field_idx: np.ndarray
+    base_idx: np.ndarray
+    op: np.ndarray
+    lo: np.ndarray
+    hi: np.ndarray
+    knot_start: np.ndarray
+    knot_stop: np.ndarray
+    knot_x: np.ndarray
+    knot_y: np.ndarray
+
+
+@njit(cache=True)
+def _interp(x, xs, ys):
+    """Linear interpolation with ``np.interp`` end clamping."""
+    n = xs.shape[0]
+    if x <= xs[0]:
+        return ys[0]
+    if x >= xs[n - 1]:
+        return ys[n - 1]
+    lo = 0
+    hi = n - 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if xs[mid] <= x:
+            lo = mid
+        else:
+            hi = mid
+    return ys[lo] + (x - xs[lo]) * (ys[hi] - ys[lo]) / (xs[hi] - xs[lo])
+
+
+@njit(parallel=True, cache=True)
+def apply_ply(
+    arr,
+    field_idx,
+    base_idx,
+    op,
+    lo,
+    hi,
+    knot_start,
+    knot_stop,
+    knot_x,
+    knot_y,
+    mask,
+):
+    """Write the AND of all encoded conditions for every cell into ``mask``."""
+    n_cells = mask.shape[0]
+    n_conds = op.shape[0]
+    for i in prange(n_cells):
+        ok = True
+        for c in range(n_conds):
+            v = arr[field_idx[c], i]
+            code = op[c]
+            if code == Op.IN_RANGE:
+                ok = v >= lo[c] and v <= hi[c]
+            elif code == Op.GT:
+                ok = v > lo[c]
+            elif code == Op.LT:
+                ok = v < lo[c]
+            else:
+                s = knot_start[c]
+                e = knot_stop[c]
+                ref = _interp(arr[base_idx[c], i], knot_x[s:e], knot_y[s:e])
+                if code == Op.GT_DATUM:
+                    ok = v > ref
+                else:
+                    ok = v < ref
+            if not ok:
+                break
+        mask[i] = ok
+    return mask
+
+
+@njit(parallel=True, cache=True)
+def write_ply(
+    mask,
+    thickness,
+    material_id,
+    angle,
+    out_material,
+    out_angle,
+    out_thickness,
+    total_thickness,
+    n_plies,
+    parent_thickness,
+):
+    """Scatter one ply into its output arrays and accumulate the summaries.
+
+    ``thickness`` holds one value per cell, or a single value for all cells.
+    """
+    n_cells = mask.shape[0]
+    step = 1 if thickness.shape[0] == n_cells else 0
+    for i in prange(n_cells):
+        if mask[i]:
+            t = np.float32(thickness[i * step])
+            out_material[i] = material_id
+            out_angle[i] = angle
+            out_thickness[i] = t
+            total_thickness[i] += t
+            n_plies[i] += 1
+            parent_thickness[i] += t
+        else:
+            out_material[i] = -1
+            out_angle[i] = 0.0
+            out_thickness[i] = 0.0
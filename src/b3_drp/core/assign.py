@@ -2,26 +2,58 @@
 
 import numpy as np
 import pyvista as pv
-import pandas as pd
 import json
 import logging
+import os
 import re
-from typing import Dict, List, Any, Union
+from functools import lru_cache
+from types import CodeType
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple, Union
 from collections import defaultdict
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from functools import partial
-
+from concurrent.futures import ThreadPoolExecutor
+
+from ._cond_kernel import (
+    HAVE_NUMBA,
+    ConditionArrays,
+    Op,
+    apply_ply,
+    write_ply,
+)
 from .models import Config, MatDB, Condition
 
 logger = logging.getLogger(__name__)
 
+# Per-ply material id arrays; -1 marks cells the ply does not cover
+MATERIAL_DTYPE = np.int16
+
+# Ufunc for each comparison operator, bound once
+_COMPARISONS = {">": np.greater, "<": np.less}
+
+# Files read by assign_plies, keyed by path and holding (stamp, contents)
+_grid_cache: Dict[str, Tuple[Tuple[int, int], pv.DataSet]] = {}
+_matdb_cache: Dict[str, Tuple[Tuple[int, int], MatDB]] = {}
+
+
+def _file_stamp(path: str) -> Tuple[int, int]:
+    """Modification time and size, which change whenever the file is rewritten."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def clear_caches() -> None:
+    """Drop the grids and material databases kept by ``read_grid``/``load_matdb``."""
+    _grid_cache.clear()
+    _matdb_cache.clear()
+
 
 def load_config(config_path: str) -> Config:
     """Load and validate configuration from YAML file."""
     import yaml
 
+    # libyaml's C loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(config_path, "r") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=loader)
     if "laminates" in data:
         laminates = data.pop("laminates")
         data.update(laminates)
@@ -32,81 +64,414 @@ def load_config(config_path: str) -> Config:
 
 
 def load_matdb(matdb_path: Union[str, dict]) -> MatDB:
-    """Load and validate material database from JSON file or dict."""
+    """Load and validate material database from JSON file or dict.
+
+    Files are parsed once and reused until they change on disk.
+    """
     if isinstance(matdb_path, str):
+        path = os.path.abspath(matdb_path)
+        stamp = _file_stamp(path)
+        cached = _matdb_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
         with open(matdb_path, "r") as f:
             data = json.load(f)
+        matdb = MatDB(data)
+        _matdb_cache[path] = (stamp, matdb)
     else:
-        data = matdb_path
+        matdb = MatDB(matdb_path)
     logger.info("Loaded material database")
-    return MatDB(data)
-
-
-def prepare_grid(grid: pv.UnstructuredGrid, required_fields: List[str]) -> pd.DataFrame:
-    """Prepare grid data into DataFrame."""
-    df = pd.DataFrame()
+    return matdb
+
+
+def read_grid(grid_path: str) -> pv.DataSet:
+    """Read a grid, reusing the previous read while the file is unchanged.
+
+    Returns a shallow copy, so arrays added by the caller do not leak into
+    the cached grid.
+    """
+    path = os.path.abspath(grid_path)
+    stamp = _file_stamp(path)
+    cached = _grid_cache.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = _grid_cache[path] = (stamp, pv.read(path))
+    return cached[1].copy(deep=False)
+
+
+class GridFields(dict):
+    """Field views keyed by name, backed by one contiguous ``(F, N)`` block.
+
+    ``dtypes`` keeps each field's dtype on the grid, which the block may have
+    widened.
+    """
+
+    def __init__(
+        self,
+        block: np.ndarray,
+        names: List[str],
+        dtypes: Optional[List[np.dtype]] = None,
+    ):
+        super().__init__(zip(names, block))
+        self.block = block
+        self.index = {name: i for i, name in enumerate(names)}
+        self.dtypes = dict(zip(names, dtypes or [block.dtype] * len(names)))
+
+
+def _threshold(value: float, dtype: np.dtype) -> float:
+    """``value`` rounded as NumPy rounds a Python scalar compared with ``dtype``.
+
+    Float32 fields are compared against float32 thresholds; comparing widened
+    values against the rounded threshold gives the same result.
+    """
+    return float(np.array(value, dtype=np.result_type(dtype, 0.0)))
+
+
+def _field_dtype(fields: Dict[str, np.ndarray], field: str) -> np.dtype:
+    """Dtype of ``field`` on the grid, before any widening into a block."""
+    return getattr(fields, "dtypes", {}).get(field, fields[field].dtype)
+
+
+def compute_cell_centers(grid: pv.DataSet) -> np.ndarray:
+    """Mean of each cell's points as an ``(N, 3)`` array.
+
+    Sums point coordinates straight from the connectivity array, without
+    building the ``PolyData`` that ``cell_centers()`` returns.
+    """
+    if not isinstance(grid, pv.UnstructuredGrid):
+        grid = grid.cast_to_unstructured_grid()
+    offsets = pv.convert_array(grid.GetCells().GetOffsetsArray())
+    sums = np.add.reduceat(grid.points[grid.cell_connectivity], offsets[:-1], axis=0)
+    return sums / np.diff(offsets)[:, None]
+
+
+def prepare_grid(
+    grid: pv.UnstructuredGrid,
+    required_fields: List[str],
+    auto_compute_coords: bool = False,
+) -> GridFields:
+    """Pack required cell fields field-major into one contiguous block.
+
+    Fields that only exist as point data are averaged onto the cells with a
+    single conversion covering just those fields. With
+    ``auto_compute_coords``, missing ``x``, ``y`` and ``z`` fields are filled
+    with the cell center coordinates.
+    """
+    point_only = [
+        f for f in required_fields if f not in grid.cell_data and f in grid.point_data
+    ]
+    converted = {}
+    if point_only:
+        logger.info(f"Converting point data to cell data for fields {point_only}")
+        # Convert on a shallow copy carrying only the needed point arrays
+        source = grid.copy(deep=False)
+        source.clear_data()
+        for field in point_only:
+            source.point_data[field] = grid.point_data[field]
+        converted = source.point_data_to_cell_data(progress_bar=False).cell_data
+    columns = []
+    centers = None
     for field in required_fields:
         if field in grid.cell_data:
-            df[field] = grid.cell_data[field]
+            columns.append(np.asarray(grid.cell_data[field]))
             logger.info(f"Using cell data for field {field}")
+        elif field in converted:
+            columns.append(np.asarray(converted[field]))
+            logger.info(f"Using converted point data for field {field}")
+        elif auto_compute_coords and field in ("x", "y", "z"):
+            if centers is None:
+                centers = compute_cell_centers(grid)
+            columns.append(centers[:, "xyz".index(field)])
+            logger.info(f"Using cell center coordinates for field {field}")
         else:
             raise ValueError(f"Required field {field} not found in grid.")
-    return df
+    block = np.empty(
+        (len(columns), grid.n_cells), dtype=np.result_type(np.float32, *columns)
+    )
+    for row, column in zip(block, columns):
+        row[:] = column
+    return GridFields(
+        block, list(required_fields), [column.dtype for column in columns]
+    )
+
+
+class DatumLUT(NamedTuple):
+    """Piecewise-linear datum as sorted knots with per-segment coefficients."""
+
+    xs: np.ndarray
+    slope: np.ndarray
+    intercept: np.ndarray
+
+
+def build_datum_lut(values: List[List[float]]) -> DatumLUT:
+    """Sort datum knots and precompute slope and intercept per segment."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.argsort(values[:, 0], kind="stable")]
+    xs, ys = values[:, 0], values[:, 1]
+    if len(xs) == 1:
+        return DatumLUT(xs, np.zeros(1), ys.copy())
+    dx = np.diff(xs)
+    flat = dx == 0
+    slope = np.diff(ys) / np.where(flat, 1.0, dx)
+    slope[flat] = 0.0
+    intercept = ys[:-1] - slope * xs[:-1]
+    # A zero-width segment is only selected at the last knot
+    intercept[flat] = ys[1:][flat]
+    return DatumLUT(xs, slope, intercept)
+
+
+def eval_datum_lut(lut: DatumLUT, x: np.ndarray) -> np.ndarray:
+    """Evaluate a datum LUT with ``np.interp`` end clamping."""
+    xc = np.clip(x, lut.xs[0], lut.xs[-1])
+    seg = np.searchsorted(lut.xs, xc, side="right") - 1
+    np.clip(seg, 0, len(lut.slope) - 1, out=seg)
+    return lut.slope[seg] * xc + lut.intercept[seg]
+
+
+def interpolate_datum(
+    name: str,
+    datums: Dict[str, Any],
+    fields: Dict[str, np.ndarray],
+    datum_cache: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """Datum ``name`` evaluated on its base field, from ``datum_cache`` if set."""
+    if datum_cache is not None and name in datum_cache:
+        return datum_cache[name]
+    datum = datums[name]
+    return eval_datum_lut(build_datum_lut(datum["values"]), fields[datum["base"]])
+
+
+def _bin_coefficients(
+    lut: DatumLUT, breaks: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Slope and intercept of ``lut`` on each bin starting at ``breaks``.
+
+    ``breaks`` must contain every knot of ``lut``, so each bin lies inside
+    one datum segment; bins outside the knots hold the clamped end values.
+    """
+    seg = np.searchsorted(lut.xs, breaks, side="right") - 1
+    # Decide inner/past-the-end on the unclipped index
+    past_end = seg >= len(lut.xs) - 1
+    inner = (seg >= 0) & ~past_end
+    seg = np.clip(seg, 0, len(lut.slope) - 1)
+    first, last = eval_datum_lut(lut, lut.xs[[0, -1]])
+    slope = np.where(inner, lut.slope[seg], 0.0)
+    intercept = np.where(inner, lut.intercept[seg], np.where(past_end, last, first))
+    return slope, intercept
+
+
+def interpolate_datums(
+    names: List[str], datums: Dict[str, Any], fields: Dict[str, np.ndarray]
+) -> Dict[str, np.ndarray]:
+    """Evaluate each named datum once, for reuse across plies.
+
+    Datums sharing a base field are binned against the union of their knots
+    with one search over the field; each datum is then a gather of per-bin
+    coefficients.
+    """
+    by_base = defaultdict(list)
+    for name in names:
+        by_base[datums[name]["base"]].append(name)
+    cache = {}
+    for base, group in by_base.items():
+        x = fields[base]
+        luts = [build_datum_lut(datums[name]["values"]) for name in group]
+        if len(luts) == 1:
+            cache[group[0]] = eval_datum_lut(luts[0], x)
+            continue
+        knots = np.unique(np.concatenate([lut.xs for lut in luts]))
+        xc = np.clip(x, knots[0], knots[-1])
+        bins = np.searchsorted(knots, xc, side="right") - 1
+        logger.debug(f"Binned {len(group)} datums on {base} into {len(knots)} bins")
+        for name, lut in zip(group, luts):
+            slope, intercept = _bin_coefficients(lut, knots)
+            cache[name] = slope[bins] * xc + intercept[bins]
+    return cache
 
 
 def evaluate_conditions(
-    df: pd.DataFrame, conditions: List[Condition], datums: Dict[str, Any]
+    fields: Dict[str, np.ndarray],
+    conditions: List[Condition],
+    datums: Dict[str, Any],
+    out: Optional[np.ndarray] = None,
+    tmp: Optional[np.ndarray] = None,
+    datum_cache: Optional[Dict[str, np.ndarray]] = None,
 ) -> np.ndarray:
-    """Evaluate conditions vectorized."""
+    """Evaluate conditions vectorized, ANDing in place into ``out``.
+
+    ``tmp`` is an optional scratch buffer of the same shape, so callers
+    evaluating many condition lists can reuse one allocation. Datums found
+    in ``datum_cache`` are not re-interpolated.
+    """
     logger.info(f"Evaluating {len(conditions)} conditions")
-    mask = np.ones(len(df), dtype=bool)
+    mask = out
+    if mask is None:
+        mask = np.empty(len(next(iter(fields.values()))), dtype=bool)
+    mask.fill(True)
+    if tmp is None:
+        tmp = np.empty_like(mask)
     for cond in conditions:
         field = cond.field
         operator = cond.operator
         operand = cond.operand
         logger.debug(f"Evaluating condition: {field} {operator} {operand}")
+        values = fields[field]
+        dtype = _field_dtype(fields, field)
         if operator == "in_range":
-            min_v, max_v = operand
-            mask &= (df[field] >= min_v) & (df[field] <= max_v)
-        elif operator == ">":
+            min_v, max_v = (_threshold(v, dtype) for v in operand)
+            mask &= np.greater_equal(values, min_v, out=tmp)
+            mask &= np.less_equal(values, max_v, out=tmp)
+        elif operator in _COMPARISONS:
             if isinstance(operand, str):
                 if operand in datums:
-                    datum = datums[operand]
-                    values = np.array(datum["values"])
-                    sort_idx = np.argsort(values[:, 0])
-                    values = values[sort_idx]
-                    interp_vals = np.interp(
-                        df[datum["base"]], values[:, 0], values[:, 1]
-                    )
-                    mask &= df[field] > interp_vals
+                    rhs = interpolate_datum(operand, datums, fields, datum_cache)
                     logger.debug(f"Interpolated datum {operand} for field {field}")
                 else:
                     raise ValueError(f"Datum {operand} not found")
             else:
-                mask &= df[field] > operand
+                rhs = _threshold(operand, dtype)
+            mask &= _COMPARISONS[operator](values, rhs, out=tmp)
         # Add more operators as needed
     logger.info(f"Conditions evaluation complete, {mask.sum()} cells match")
     return mask
 
 
+def evaluate_ply_masks(
+    fields: Dict[str, np.ndarray],
+    ply_conditions: List[List[Condition]],
+    datums: Dict[str, Any],
+    out: Optional[np.ndarray] = None,
+    datum_cache: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """Evaluate the conditions of all plies into a ``(P, N)`` boolean matrix.
+
+    Scalar comparisons on the same field are gathered across plies and
+    evaluated with one broadcast per field and operator; datum comparisons
+    fall back to ``evaluate_conditions`` one condition at a time.
+    """
+    masks = out
+    if masks is None:
+        n_cells = len(next(iter(fields.values())))
+        masks = np.empty((len(ply_conditions), n_cells), dtype=bool)
+    masks.fill(True)
+    groups = defaultdict(list)
+    # Datum conditions repeated across plies are evaluated once per call
+    cond_masks = {}
+    tmp = None
+    for p, conditions in enumerate(ply_conditions):
+        for cond in conditions:
+            operator = cond.operator
+            operand = cond.operand
+            if operator == "in_range":
+                groups[(cond.field, operator)].append((p, *operand))
+            elif operator in _COMPARISONS and not isinstance(operand, str):
+                groups[(cond.field, operator)].append((p, operand, operand))
+            else:
+                key = _condition_key([cond])
+                if key not in cond_masks:
+                    if tmp is None:
+                        tmp = np.empty(masks.shape[1], dtype=bool)
+                    cond_masks[key] = evaluate_conditions(
+                        fields, [cond], datums, tmp=tmp, datum_cache=datum_cache
+                    )
+                masks[p] &= cond_masks[key]
+    for (field, operator), entries in groups.items():
+        ply_idx, lo, hi = zip(*entries)
+        # Plies sharing a threshold share one comparison row; thresholds are
+        # rounded to the field's grid dtype as in ``evaluate_conditions``
+        dtype = np.result_type(_field_dtype(fields, field), 0.0)
+        bounds, rows = np.unique(
+            np.column_stack([lo, hi]).astype(dtype), axis=0, return_inverse=True
+        )
+        lo, hi = bounds[:, :1], bounds[:, 1:]
+        values = fields[field][None, :]
+        if operator == "in_range":
+            group = values >= lo
+            group &= values <= hi
+        else:
+            group = _COMPARISONS[operator](values, lo)
+        logger.debug(
+            f"Evaluated {len(bounds)} distinct {operator} conditions on {field}"
+        )
+        for p, row in zip(ply_idx, rows.ravel()):
+            masks[p] &= group[row]
+    return masks
+
+
+def evaluate_ply_masks_chunked(
+    fields: Dict[str, np.ndarray],
+    ply_conditions: List[List[Condition]],
+    datums: Dict[str, Any],
+    out: Optional[np.ndarray] = None,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 1 << 16,
+    datum_cache: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """Evaluate ``evaluate_ply_masks`` over cell chunks in a thread pool.
+
+    NumPy releases the GIL inside its ufuncs, so chunks run concurrently;
+    each chunk writes into its own column slice of ``out``.
+    """
+    masks = out
+    if masks is None:
+        n_cells = len(next(iter(fields.values())))
+        masks = np.empty((len(ply_conditions), n_cells), dtype=bool)
+    starts = range(0, masks.shape[1], chunk_size)
+
+    def run(start):
+        cells = slice(start, start + chunk_size)
+        if isinstance(fields, GridFields):
+            chunk = GridFields(
+                fields.block[:, cells], list(fields), list(fields.dtypes.values())
+            )
+        else:
+            chunk = {name: values[cells] for name, values in fields.items()}
+        chunk_cache = {name: values[cells] for name, values in cache.items()}
+        evaluate_ply_masks(
+            chunk,
+            ply_conditions,
+            datums,
+            out=masks[:, cells],
+            datum_cache=chunk_cache,
+        )
+
+    cache = datum_cache or {}
+    if len(starts) <= 1 or max_workers == 1:
+        evaluate_ply_masks(
+            fields, ply_conditions, datums, out=masks, datum_cache=datum_cache
+        )
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(run, starts))
+    return masks
+
+
+@lru_cache(maxsize=None)
+def _compile_expression(expr: str) -> CodeType:
+    """Compile a thickness expression once per distinct string."""
+    return compile(expr, "<thickness>", "eval")
+
+
 def parse_thickness_expression(
-    thickness_expr: str, datums: Dict[str, Any], df: pd.DataFrame
+    thickness_expr: str,
+    datums: Dict[str, Any],
+    fields: Dict[str, np.ndarray],
+    datum_cache: Optional[Dict[str, np.ndarray]] = None,
 ) -> np.ndarray:
     """Parse and evaluate thickness expression with datums."""
-    # Find datum names in expression
-    words = re.findall(r"\b\w+\b", thickness_expr)
-    datum_names = [w for w in words if w in datums]
-    # Interpolate each datum
+    try:
+        code = _compile_expression(thickness_expr)
+    except SyntaxError as e:
+        raise ValueError(
+            f"Error evaluating thickness expression '{thickness_expr}': {e}"
+        )
+    # Interpolate each datum the expression refers to
     interp_datums = {}
-    for name in datum_names:
-        datum = datums[name]
-        values = np.array(datum["values"])
-        sort_idx = np.argsort(values[:, 0])
-        values = values[sort_idx]
-        interp_datums[name] = np.interp(df[datum["base"]], values[:, 0], values[:, 1])
+    for name in code.co_names:
+        if name in datums:
+            interp_datums[name] = interpolate_datum(name, datums, fields, datum_cache)
     # Evaluate expression
     try:
-        result = eval(thickness_expr, {"__builtins__": None}, interp_datums)
+        result = eval(code, {"__builtins__": None}, interp_datums)
         return np.array(result, dtype=np.float32)
     except Exception as e:
         raise ValueError(
@@ -116,24 +481,24 @@ def parse_thickness_expression(
 
 def get_thickness(
     thickness: Union[float, str],
-    df: pd.DataFrame,
+    fields: Dict[str, np.ndarray],
     datums: Dict[str, Any],
+    n_cells: Optional[int] = None,
+    datum_cache: Optional[Dict[str, np.ndarray]] = None,
 ) -> np.ndarray:
     """Get thickness array, either constant, datum, or expression."""
     if isinstance(thickness, float):
         logger.debug(f"Using constant thickness {thickness}")
-        return np.full(len(df), thickness, dtype=np.float32)
+        if n_cells is None:
+            n_cells = len(next(iter(fields.values())))
+        return np.full(n_cells, thickness, dtype=np.float32)
     elif isinstance(thickness, str):
         if thickness in datums:
-            datum = datums[thickness]
-            values = np.array(datum["values"])
-            sort_idx = np.argsort(values[:, 0])
-            values = values[sort_idx]
             logger.debug(f"Interpolating thickness from datum {thickness}")
-            return np.interp(df[datum["base"]], values[:, 0], values[:, 1])
+            return interpolate_datum(thickness, datums, fields, datum_cache)
         else:
             logger.debug(f"Evaluating thickness expression {thickness}")
-            return parse_thickness_expression(thickness, datums, df)
+            return parse_thickness_expression(thickness, datums, fields, datum_cache)
     else:
         raise ValueError("Thickness must be float or string.")
 
@@ -148,44 +513,134 @@ def get_datums_from_thickness(
     return []
 
 
-def _process_ply(ply_data, df, datums, matdb):
-    """Worker function for parallel ply processing."""
-    idx, ply = ply_data
-    key = ply.key
-    parent = ply.parent
-    mat_id = matdb.root[ply.mat].id
-    angle = ply.angle
-    ply_num = f"{idx + 1:06d}"
-
-    # Evaluate condition mask (vectorized)
-    mask = evaluate_conditions(df, ply.conditions, datums)
-
-    # Compute thickness array
-    thickness_arr = get_thickness(ply.thickness, df, datums)
-
-    # Return only serializable NumPy arrays + metadata
-    return {
-        "ply_num": ply_num,
-        "parent": parent,
-        "key": key,
-        "mask": mask.astype(np.bool_),
-        "thickness": thickness_arr.astype(np.float32),
-        "material_id": mat_id,
-        "angle": float(angle),
-    }
+def compile_conditions(
+    conditions: List[Condition],
+    datums: Dict[str, Any],
+    index: Dict[str, int],
+    dtypes: Optional[Dict[str, np.dtype]] = None,
+) -> ConditionArrays:
+    """Lower a ply's conditions into flat arrays for the compiled kernel.
+
+    Scalar thresholds are rounded to each field's grid dtype in ``dtypes``
+    (float64 when not given), as NumPy does when comparing with a scalar.
+    """
+    dtypes = dtypes or {}
+    field_idx, base_idx, ops, lo, hi = [], [], [], [], []
+    knot_start, knot_stop, knot_x, knot_y = [], [], [], []
+    n_knots = 0
+    for cond in conditions:
+        operator = cond.operator
+        operand = cond.operand
+        base = 0
+        start = stop = n_knots
+        if operator == "in_range":
+            code = Op.IN_RANGE
+            dtype = dtypes.get(cond.field, np.float64)
+            low, high = (_threshold(v, dtype) for v in operand)
+        elif operator in (">", "<"):
+            if isinstance(operand, str):
+                if operand not in datums:
+                    raise ValueError(f"Datum {operand} not found")
+                datum = datums[operand]
+                values = np.array(datum["values"], dtype=np.float64)
+                values = values[np.argsort(values[:, 0], kind="stable")]
+                knot_x.append(values[:, 0])
+                knot_y.append(values[:, 1])
+                n_knots += len(values)
+                stop = n_knots
+                base = index[datum["base"]]
+                code = Op.GT_DATUM if operator == ">" else Op.LT_DATUM
+                low = high = 0.0
+            else:
+                code = Op.GT if operator == ">" else Op.LT
+                low = high = _threshold(operand, dtypes.get(cond.field, np.float64))
+        else:
+            logger.warning(f"Ignoring unsupported operator {operator}")
+            continue
+        field_idx.append(index[cond.field])
+        base_idx.append(base)
+        ops.append(code)
+        lo.append(low)
+        hi.append(high)
+        knot_start.append(start)
+        knot_stop.append(stop)
+    return ConditionArrays(
+        field_idx=np.array(field_idx, dtype=np.int64),
+        base_idx=np.array(base_idx, dtype=np.int64),
+        op=np.array(ops, dtype=np.int8),
+        lo=np.array(lo, dtype=np.float64),
+        hi=np.array(hi, dtype=np.float64),
+        knot_start=np.array(knot_start, dtype=np.int64),
+        knot_stop=np.array(knot_stop, dtype=np.int64),
+        knot_x=np.concatenate(knot_x) if knot_x else np.empty(0),
+        knot_y=np.concatenate(knot_y) if knot_y else np.empty(0),
+    )
+
+
+def _scatter(
+    out: np.ndarray, cells: Optional[np.ndarray], value: Any, fill: float
+) -> np.ndarray:
+    """Fill ``out`` with ``value`` on ``cells`` and ``fill`` elsewhere.
+
+    ``cells`` is a boolean mask or an index array, or None when every cell
+    is covered; ``value`` is a scalar or a per-cell array.
+    """
+    if cells is None:
+        out[...] = value
+        return out
+    out.fill(fill)
+    out[cells] = value if np.ndim(value) == 0 else value[cells]
+    return out
+
+
+def _condition_key(conditions: List[Condition]) -> tuple:
+    """Hashable identity of a condition list."""
+    return tuple(
+        (
+            cond.field,
+            cond.operator,
+            tuple(cond.operand) if isinstance(cond.operand, list) else cond.operand,
+        )
+        for cond in conditions
+    )
+
+
+class PlyPlan(NamedTuple):
+    """Per-ply values resolved once before evaluation."""
+
+    prefix: str
+    parent: str
+    material_id: int
+    angle: float
+    thickness: Union[float, str]
+    conditions: List[Condition]
+    cond_arrays: Optional[ConditionArrays]
 
 
 def assign_plies(
     config: Config,
-    grid_path: str,
+    grid_path: Union[str, pv.DataSet],
     matdb_path: Union[str, dict],
     output_path: str,
     max_workers: int = None,
+    compression: Optional[str] = "lz4",
+    auto_compute_coords: bool = False,
 ) -> pv.UnstructuredGrid:
-    """Assign composite plies to FEA mesh using parallel processing."""
-    logger.info(f"Loading grid from {grid_path}")
-    grid = pv.read(grid_path)
-    grid = grid.point_data_to_cell_data(pass_point_data=True, progress_bar=False)
+    """Assign composite plies to FEA mesh.
+
+    ``grid_path`` may also be an in-memory grid, which is left unchanged; the
+    result arrays go onto a shallow copy. Without numba, ``max_workers`` caps
+    the threads used to evaluate ply conditions over chunks of cells.
+    ``compression`` is passed to the binary VTK writer; LZ4 writes several
+    times faster than zlib for larger files.
+    ``auto_compute_coords`` lets conditions use ``x``, ``y`` and ``z`` on grids
+    that do not carry them, taking the cell centers instead.
+    """
+    if isinstance(grid_path, pv.DataSet):
+        grid = grid_path.copy(deep=False)
+    else:
+        logger.info(f"Loading grid from {grid_path}")
+        grid = read_grid(grid_path)
 
     matdb = load_matdb(matdb_path)
     datums = {k: v.model_dump() for k, v in (config.datums or {}).items()}
@@ -196,68 +651,178 @@ def assign_plies(
     missing = used_mats - set(matdb.root.keys())
     if missing:
         raise ValueError(f"Missing materials: {missing}")
+    id_range = np.iinfo(MATERIAL_DTYPE)
+    out_of_range = {
+        m: matdb.root[m].id
+        for m in used_mats
+        if not id_range.min <= matdb.root[m].id <= id_range.max
+    }
+    if out_of_range:
+        raise ValueError(f"Material ids do not fit in {id_range.dtype}: {out_of_range}")
     logger.info(f"Used materials: {used_mats}")
 
-    # Precompute required fields
+    # Precompute required fields and the datums used by conditions and
+    # thicknesses
     required_fields = set()
+    condition_datums = set()
+    thickness_datums = set()
     for ply in plies:
         for cond in ply.conditions:
             required_fields.add(cond.field)
             if isinstance(cond.operand, str) and cond.operand in datums:
-                required_fields.add(datums[cond.operand]["base"])
-        for name in get_datums_from_thickness(ply.thickness, datums):
-            required_fields.add(datums[name]["base"])
-    df = prepare_grid(grid, list(required_fields))
-    logger.info(
-        f"Prepared DataFrame with {len(df):,} cells and {len(df.columns)} fields"
+                condition_datums.add(cond.operand)
+        if isinstance(ply.thickness, str) and ply.thickness in datums:
+            thickness_datums.add(ply.thickness)
+        thickness_datums.update(get_datums_from_thickness(ply.thickness, datums))
+    for name in condition_datums | thickness_datums:
+        required_fields.add(datums[name]["base"])
+    fields = prepare_grid(
+        grid, list(required_fields), auto_compute_coords=auto_compute_coords
     )
-
-    # Sort plies for deterministic output
-    plies_with_idx = sorted(enumerate(plies), key=lambda x: (x[1].key, x[0]))
-
-    # Parallel processing of plies
-    logger.info(
-        f"Starting parallel evaluation of {len(plies_with_idx)} plies on {max_workers or 'auto'} workers"
-    )
-
-    worker = partial(_process_ply, df=df, datums=datums, matdb=matdb)
-
-    results = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(worker, ply_item) for ply_item in plies_with_idx]
-
-        for future in as_completed(futures):
-            results.append(future.result())
-
-    # Sort results back to original order
-    results.sort(key=lambda r: r["ply_num"])
+    n_cells = grid.n_cells
+    logger.info(f"Prepared {len(fields)} fields over {n_cells:,} cells")
+
+    # Interpolate each datum once and share it across plies; the compiled
+    # kernel interpolates condition datums itself
+    cached = thickness_datums if HAVE_NUMBA else condition_datums | thickness_datums
+    datum_cache = interpolate_datums(sorted(cached), datums, fields)
+
+    # Resolve everything the ply loop needs up front; the plan keeps the
+    # definition order, in which the ply arrays are written back
+    plan = [
+        PlyPlan(
+            prefix=f"ply_{i + 1:06d}_{ply.parent}_{ply.key}",
+            parent=ply.parent,
+            material_id=matdb.root[ply.mat].id,
+            angle=float(ply.angle),
+            thickness=ply.thickness,
+            conditions=ply.conditions,
+            cond_arrays=(
+                compile_conditions(ply.conditions, datums, fields.index, fields.dtypes)
+                if HAVE_NUMBA
+                else None
+            ),
+        )
+        for i, ply in enumerate(plies)
+    ]
+
+    # Plies with identical condition lists (e.g. the layers of one laminate)
+    # share a mask row
+    row_of_key = {}
+    unique_plan = []
+    mask_rows = []
+    for ply_plan in plan:
+        key = _condition_key(ply_plan.conditions)
+        if key not in row_of_key:
+            row_of_key[key] = len(unique_plan)
+            unique_plan.append(ply_plan)
+        mask_rows.append(row_of_key[key])
+
+    # Evaluate every distinct condition list into one (U, N) mask matrix
+    masks = np.empty((len(unique_plan), n_cells), dtype=bool)
+    logger.info(f"{len(plan)} plies share {len(unique_plan)} distinct condition lists")
+    if HAVE_NUMBA:
+        logger.info("Evaluating plies with the compiled kernel")
+        for ply_plan, mask in zip(unique_plan, masks):
+            apply_ply(fields.block, *ply_plan.cond_arrays, mask)
+    else:
+        logger.info("Evaluating plies as one batch")
+        evaluate_ply_masks_chunked(
+            fields,
+            [p.conditions for p in unique_plan],
+            datums,
+            out=masks,
+            max_workers=max_workers,
+            datum_cache=datum_cache,
+        )
 
     # Serial assignment to grid
     logger.info("Gathering results and assigning to grid (serial)")
 
-    total_thickness = np.zeros(len(df), dtype=np.float32)
-    n_plies = np.zeros(len(df), dtype=np.int32)
-    per_parent_thickness = defaultdict(lambda: np.zeros(len(df), dtype=np.float32))
-
-    for res in results:
-        mask = res["mask"]
-        thick = res["thickness"]
-
-        prefix = f"ply_{res['ply_num']}_{res['parent']}_{res['key']}"
-        grid.cell_data[f"{prefix}_material"] = np.where(mask, res["material_id"], -1)
-        grid.cell_data[f"{prefix}_angle"] = np.where(mask, res["angle"], 0.0)
-        grid.cell_data[f"{prefix}_thickness"] = np.where(mask, thick, 0.0)
-
-        total_thickness += np.where(mask, thick, 0)
-        n_plies += mask.astype(np.int32)
-        per_parent_thickness[res["parent"]] += np.where(mask, thick, 0)
+    total_thickness = np.zeros(n_cells, dtype=np.float32)
+    # A cell's ply count is bounded by the number of plies
+    n_plies_dtype = np.uint16 if len(plan) <= np.iinfo(np.uint16).max else np.uint32
+    n_plies = np.zeros(n_cells, dtype=n_plies_dtype)
+    # One row per parent, in order of first appearance
+    parents = list(dict.fromkeys(p.parent for p in plan))
+    parent_index = {parent: i for i, parent in enumerate(parents)}
+    parent_block = np.zeros((len(parents), n_cells), dtype=np.float32)
+
+    empty_plies = []
+
+    # Per-ply output arrays are row views into one block per kind, so the
+    # loop allocates nothing and the grid arrays share the blocks' memory
+    covered_counts = np.count_nonzero(masks, axis=1)
+    n_written = int(np.count_nonzero(covered_counts[mask_rows]))
+    material_block = np.empty((n_written, n_cells), dtype=MATERIAL_DTYPE)
+    angle_block = np.empty((n_written, n_cells), dtype=np.float32)
+    thickness_block = np.empty((n_written, n_cells), dtype=np.float32)
+    row = 0
+
+    for ply_plan, mask_row in zip(plan, mask_rows):
+        mask = masks[mask_row]
+        covered = covered_counts[mask_row]
+        prefix = ply_plan.prefix
+        parent_thickness = parent_block[parent_index[ply_plan.parent]]
+        if covered == 0:
+            # Nothing to write; record the ply so readers can tell it apart
+            # from a missing one
+            logger.debug(f"Ply {prefix} covers no cells, skipping")
+            empty_plies.append(prefix)
+            continue
+
+        thickness = ply_plan.thickness
+        if not isinstance(thickness, float):
+            thickness = get_thickness(
+                thickness, fields, datums, datum_cache=datum_cache
+            )
+        material = material_block[row]
+        angle = angle_block[row]
+        ply_thickness = thickness_block[row]
+        row += 1
+        if HAVE_NUMBA:
+            # One fused pass writes the ply arrays and the running sums
+            write_ply(
+                mask,
+                np.atleast_1d(thickness),
+                ply_plan.material_id,
+                ply_plan.angle,
+                material,
+                angle,
+                ply_thickness,
+                total_thickness,
+                n_plies,
+                parent_thickness,
+            )
+        else:
+            # Sparse plies scatter through an index array, touching only the
+            # covered cells after the fill
+            if covered == n_cells:
+                cells = None
+            elif covered * 32 < n_cells:
+                cells = np.flatnonzero(mask)
+            else:
+                cells = mask
+            _scatter(material, cells, ply_plan.material_id, -1)
+            _scatter(angle, cells, ply_plan.angle, 0.0)
+            _scatter(ply_thickness, cells, thickness, 0.0)
+            total_thickness += ply_thickness
+            n_plies += mask
+            parent_thickness += ply_thickness
+
+        grid.cell_data[f"{prefix}_material"] = material
+        grid.cell_data[f"{prefix}_angle"] = angle
+        grid.cell_data[f"{prefix}_thickness"] = ply_thickness
 
     # Add summary arrays
     grid.cell_data["total_thickness"] = total_thickness
     grid.cell_data["n_plies"] = n_plies
-    for parent, thick in per_parent_thickness.items():
+    for parent, thick in zip(parents, parent_block):
         grid.cell_data[f"{parent}_thickness"] = thick
+    if empty_plies:
+        logger.info(f"Skipped {len(empty_plies)} plies that cover no cells")
+        grid.field_data["empty_plies"] = empty_plies
 
     logger.info(f"Saving result to {output_path}")
-    grid.save(output_path)
+    grid.save(output_path, binary=True, compression=compression)
     return grid
@@ -14,9 +14,18 @@ def plot_grid(
     x_axis: str = "x",
     y_axis: str = "y",
     output_file: str = "plot.png",
+    plotter: Optional[pv.Plotter] = None,
 ) -> None:
-    """Plot the grid with scalar coloring and save screenshot."""
-    plotter = pv.Plotter(off_screen=True)
+    """Plot the grid with scalar coloring and save screenshot.
+
+    A given off-screen ``plotter`` is cleared and reused, saving the render
+    window setup; otherwise a temporary one is created and closed.
+    """
+    owned = plotter is None
+    if owned:
+        plotter = pv.Plotter(off_screen=True)
+    else:
+        plotter.clear()
     if scalar and scalar in grid.cell_data:
         plotter.add_mesh(grid, scalars=scalar)
     else:
@@ -27,3 +36,5 @@ def plot_grid(
     else:
         plotter.screenshot(output_file)
         logger.info(f"Plot saved to {output_file}")
+    if owned:
+        plotter.close()
@@ -0,0 +1,82 @@
+"""Shared test fixtures."""
+
+import functools
+import os
+
+import numpy as np
+import pytest
+import pyvista as pv
+from vtkmodules.vtkCommonCore import vtkObject
+
+from b3_drp.core import plotting
+
+IN_CI = "CI" in os.environ or "GITHUB_ACTIONS" in os.environ
+
+# Render off screen and keep VTK's warning output out of the test logs
+pv.OFF_SCREEN = True
+vtkObject.GlobalWarningDisplayOff()
+
+
+def _quad_points(x, y, surface=None):
+    """Points of the x/y tensor grid, x varying fastest, filled column-wise."""
+    points = np.empty((len(y) * len(x), 3))
+    points[:, 0] = np.tile(x, len(y))
+    points[:, 1] = np.repeat(y, len(x))
+    points[:, 2] = 0.0 if surface is None else surface(points[:, 0], points[:, 1])
+    return points
+
+
+@pytest.fixture
+def quad_mesh():
+    """Factory for a structured quad mesh on the x/y tensor grid.
+
+    Cell data ``x`` and ``y`` hold the cell centers. ``surface`` optionally
+    maps point ``(x, y)`` to heights; a ``z`` cell field is added when it is
+    given.
+    """
+
+    def build(x, y, surface=None):
+        # Create structured grid
+        mesh = pv.StructuredGrid()
+        mesh.points = _quad_points(x, y, surface)
+        mesh.dimensions = [len(x), len(y), 1]
+
+        # Cell centers follow from the tensor grid without a VTK filter
+        xc = 0.5 * (x[:-1] + x[1:])
+        yc = 0.5 * (y[:-1] + y[1:])
+        mesh.cell_data["x"] = np.tile(xc, len(yc))
+        mesh.cell_data["y"] = np.repeat(yc, len(xc))
+        if surface is not None:
+            # Mean of the four corner heights, as cell_centers() computes it
+            Z = mesh.points[:, 2].reshape(len(y), len(x))
+            mesh.cell_data["z"] = (
+                0.25 * (Z[:-1, :-1] + Z[1:, :-1] + Z[:-1, 1:] + Z[1:, 1:])
+            ).ravel()
+        return mesh
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def shared_plotter():
+    """One off-screen plotter reused by every test that plots."""
+    plotter = pv.Plotter(off_screen=True)
+    yield plotter
+    plotter.close()
+
+
+@pytest.fixture
+def plot_grid(request):
+    """``plot_grid`` drawing on the shared plotter, stubbed on CI.
+
+    CI runners cannot take screenshots, so there the stub only creates the
+    output file and the off-screen render is skipped altogether.
+    """
+    if not IN_CI:
+        plotter = request.getfixturevalue("shared_plotter")
+        return functools.partial(plotting.plot_grid, plotter=plotter)
+
+    def stub(grid, scalar=None, output_file="plot.png", **kwargs):
+        open(output_file, "wb").close()
+
+    return stub
@@ -2,20 +2,27 @@
 
 import numpy as np
 import pyvista as pv
-import pandas as pd
 import tempfile
 import os
 import json
 import pytest
 from b3_drp.core.assign import (
     assign_plies,
+    build_datum_lut,
+    eval_datum_lut,
     load_config,
     load_matdb,
+    compute_cell_centers,
     prepare_grid,
+    read_grid,
     evaluate_conditions,
+    evaluate_ply_masks,
+    evaluate_ply_masks_chunked,
     parse_thickness_expression,
     get_thickness,
     get_datums_from_thickness,
+    interpolate_datums,
+    GridFields,
 )
 from b3_drp.core.models import Condition, Config, Ply
 
@@ -79,14 +86,64 @@ def test_load_matdb_dict():
     assert matdb.root["carbon"].id == 1
 
 
+def test_read_grid_cache():
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]])
+    cells = np.array([4, 0, 1, 3, 2])
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD], points)
+    grid.cell_data["x"] = np.array([0.5])
+    matdb_dict = {"carbon": {"id": 1}}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        matdb_path = os.path.join(tmpdir, "matdb.json")
+        grid.save(grid_path)
+        with open(matdb_path, "w") as f:
+            json.dump(matdb_dict, f)
+
+        first = read_grid(grid_path)
+        first.cell_data["added"] = np.array([1.0])
+        assert "added" not in read_grid(grid_path).cell_data
+        assert load_matdb(matdb_path) is load_matdb(matdb_path)
+
+        # Rewriting the files with a new mtime invalidates the cached reads
+        grid.cell_data["x"] = np.array([2.5])
+        grid.save(grid_path)
+        matdb_dict["carbon"]["id"] = 2
+        with open(matdb_path, "w") as f:
+            json.dump(matdb_dict, f)
+        for path in (grid_path, matdb_path):
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        np.testing.assert_array_equal(read_grid(grid_path).cell_data["x"], [2.5])
+        assert load_matdb(matdb_path).root["carbon"].id == 2
+
+
 def test_prepare_grid():
     points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]])
     cells = np.array([4, 0, 1, 2, 3])
     grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD], points)
     grid.cell_data["x"] = np.array([0.5])
-    df = prepare_grid(grid, ["x"])
-    assert "x" in df.columns
-    assert df["x"].iloc[0] == 0.5
+    fields = prepare_grid(grid, ["x"])
+    assert "x" in fields
+    assert fields["x"][0] == 0.5
+    assert fields.block.shape == (1, 1)
+    assert fields.index == {"x": 0}
+
+
+def test_prepare_grid_point_data():
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]])
+    cells = np.array([4, 0, 1, 2, 3])
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD], points)
+    grid.point_data["r"] = np.array([0.0, 1.0, 2.0, 3.0])
+    grid.cell_data["x"] = np.array([0.5])
+    grid.point_data["unused"] = np.zeros(4)
+    fields = prepare_grid(grid, ["x", "r"])
+    assert fields["x"][0] == 0.5
+    assert fields["r"][0] == 1.5
+    # The input grid is left untouched
+    assert set(grid.cell_data) == {"x"}
+    assert set(grid.point_data) == {"r", "unused"}
 
 
 def test_prepare_grid_missing_field():
@@ -97,24 +154,45 @@ def test_prepare_grid_missing_field():
         prepare_grid(grid, ["missing"])
 
 
+def test_prepare_grid_cell_centers():
+    grid = pv.ImageData(dimensions=(4, 3, 2)).cast_to_unstructured_grid()
+    expected = np.asarray(grid.cell_centers().points)
+    np.testing.assert_allclose(compute_cell_centers(grid), expected)
+
+    with pytest.raises(ValueError):
+        prepare_grid(grid, ["x"])
+    fields = prepare_grid(grid, ["x", "z"], auto_compute_coords=True)
+    np.testing.assert_allclose(fields["x"], expected[:, 0])
+    np.testing.assert_allclose(fields["z"], expected[:, 2])
+
+
 def test_evaluate_conditions():
-    df = pd.DataFrame({"x": [0.0, 0.5, 1.0], "y": [0.0, 0.5, 1.0]})
+    fields = {"x": np.array([0.0, 0.5, 1.0]), "y": np.array([0.0, 0.5, 1.0])}
     conditions = [
         Condition(field="x", operator="in_range", operand=[0, 1]),
         Condition(field="y", operator="in_range", operand=[0, 1]),
     ]
     datums = {}
-    mask = evaluate_conditions(df, conditions, datums)
+    mask = evaluate_conditions(fields, conditions, datums)
     assert np.all(mask)  # All true
 
     conditions = [Condition(field="x", operator="in_range", operand=[0.4, 0.6])]
-    mask = evaluate_conditions(df, conditions, datums)
+    mask = evaluate_conditions(fields, conditions, datums)
     expected = np.array([False, True, False])
     np.testing.assert_array_equal(mask, expected)
 
 
+def test_evaluate_conditions_out_buffer():
+    fields = {"x": np.array([0.0, 0.5, 1.0])}
+    conditions = [Condition(field="x", operator=">", operand=0.25)]
+    out = np.zeros(3, dtype=bool)
+    mask = evaluate_conditions(fields, conditions, {}, out=out)
+    assert mask is out
+    np.testing.assert_array_equal(out, [False, True, True])
+
+
 def test_evaluate_conditions_with_datum():
-    df = pd.DataFrame({"x": [0.0, 0.5, 1.0], "y": [0.0, 0.5, 1.0]})
+    fields = {"x": np.array([0.0, 0.5, 1.0]), "y": np.array([0.0, 0.5, 1.0])}
     conditions = [
         Condition(field="y", operator=">", operand="datum_y"),
     ]
@@ -124,13 +202,70 @@ def test_evaluate_conditions_with_datum():
             "values": [[0, 0.2], [0.5, 0.3], [1, 0.4]],
         }
     }
-    mask = evaluate_conditions(df, conditions, datums)
+    mask = evaluate_conditions(fields, conditions, datums)
     expected = np.array(
         [False, True, True]
     )  # y > interp(x): 0>0.2?F, 0.5>0.3?T, 1>0.4?T
     np.testing.assert_array_equal(mask, expected)
 
 
+def test_evaluate_ply_masks():
+    fields = {"x": np.linspace(0, 1, 11), "y": np.linspace(1, 0, 11)}
+    datums = {"d": {"base": "x", "values": [[0, 0.2], [1, 0.6]]}}
+    ply_conditions = [
+        [Condition(field="x", operator="in_range", operand=[0.2, 0.6])],
+        [
+            Condition(field="x", operator="in_range", operand=[0.5, 1]),
+            Condition(field="y", operator="<", operand=0.4),
+        ],
+        [Condition(field="y", operator=">", operand="d")],
+        [],
+        [
+            Condition(field="x", operator="in_range", operand=[0.2, 0.6]),
+            Condition(field="y", operator="<", operand=0.7),
+        ],
+        [
+            Condition(field="x", operator="<", operand=0.9),
+            Condition(field="y", operator=">", operand="d"),
+        ],
+    ]
+    masks = evaluate_ply_masks(fields, ply_conditions, datums)
+    assert masks.shape == (6, 11)
+    for conditions, mask in zip(ply_conditions, masks):
+        expected = evaluate_conditions(fields, conditions, datums)
+        np.testing.assert_array_equal(mask, expected)
+    chunked = evaluate_ply_masks_chunked(
+        fields, ply_conditions, datums, max_workers=2, chunk_size=3
+    )
+    np.testing.assert_array_equal(chunked, masks)
+
+
+def test_evaluate_ply_masks_float32():
+    # Float32 values exactly on the thresholds compare as the plain arrays do
+    x = np.array([0.1, 0.2, 0.3, 0.4, 0.5], dtype=np.float32)
+    y = np.linspace(0, 1, 5)
+    ply_conditions = [
+        [Condition(field="x", operator="in_range", operand=[0.2, 0.4])],
+        [Condition(field="x", operator=">", operand=0.2)],
+        [Condition(field="x", operator="<", operand=0.4)],
+    ]
+    expected = np.array([(x >= 0.2) & (x <= 0.4), x > 0.2, x < 0.4])
+    np.testing.assert_array_equal(expected[0], [False, True, True, True, False])
+    # The block widens x to float64 next to the float64 y
+    widened = GridFields(np.array([x, y]), ["x", "y"], [x.dtype, y.dtype])
+    for fields in ({"x": x, "y": y}, widened):
+        masks = evaluate_ply_masks(fields, ply_conditions, {})
+        np.testing.assert_array_equal(masks, expected)
+        for conditions, mask in zip(ply_conditions, masks):
+            np.testing.assert_array_equal(
+                evaluate_conditions(fields, conditions, {}), mask
+            )
+        chunked = evaluate_ply_masks_chunked(
+            fields, ply_conditions, {}, max_workers=2, chunk_size=2
+        )
+        np.testing.assert_array_equal(chunked, expected)
+
+
 def test_parse_thickness_expression():
     datums = {
         "t1": {
@@ -142,21 +277,21 @@ def test_parse_thickness_expression():
             "values": [[0, 0.1], [1, 0.2], [2, 0.3]],
         },
     }
-    df = pd.DataFrame({"x": [0, 1, 2]})
-    result = parse_thickness_expression("t1 + t2", datums, df)
+    fields = {"x": np.array([0, 1, 2])}
+    result = parse_thickness_expression("t1 + t2", datums, fields)
     expected = np.array([0.101, 0.202, 0.303])
     np.testing.assert_array_almost_equal(result, expected)
 
 
 def test_parse_thickness_expression_error():
     datums = {}
-    df = pd.DataFrame({"x": [0]})
+    fields = {"x": np.array([0])}
     with pytest.raises(ValueError):
-        parse_thickness_expression("invalid", datums, df)
+        parse_thickness_expression("invalid", datums, fields)
 
 
 def test_get_thickness():
-    df = pd.DataFrame({"x": [0.0, 0.5, 1.0]})
+    fields = {"x": np.array([0.0, 0.5, 1.0])}
     datums = {
         "thickness_taper": {
             "base": "x",
@@ -165,26 +300,61 @@ def test_get_thickness():
     }
 
     # Constant thickness
-    thick = get_thickness(0.001, df, datums)
+    thick = get_thickness(0.001, fields, datums)
     expected = np.array([0.001, 0.001, 0.001])
     np.testing.assert_array_almost_equal(thick, expected)
 
     # Tapered thickness
-    thick = get_thickness("thickness_taper", df, datums)
+    thick = get_thickness("thickness_taper", fields, datums)
     expected = np.array([0.001, 0.002, 0.001])
     np.testing.assert_array_almost_equal(thick, expected)
 
     # Expression
     datums["t1"] = {"base": "x", "values": [[0, 0.1], [1, 0.2]]}
-    thick = get_thickness("t1", df, datums)
+    thick = get_thickness("t1", fields, datums)
     expected = np.array([0.1, 0.15, 0.2])
     np.testing.assert_array_almost_equal(thick, expected)
 
 
+def test_interpolate_datums():
+    fields = {"x": np.array([0.0, 0.5, 1.0])}
+    datums = {"d": {"base": "x", "values": [[0, 0.0], [1, 2.0]]}}
+    cache = interpolate_datums(["d"], datums, fields)
+    np.testing.assert_array_almost_equal(cache["d"], [0.0, 1.0, 2.0])
+
+    # Cached values are used as-is instead of being re-interpolated
+    cache = {"d": np.array([1.0, 1.0, 1.0])}
+    conditions = [Condition(field="x", operator="<", operand="d")]
+    mask = evaluate_conditions(fields, conditions, datums, datum_cache=cache)
+    np.testing.assert_array_equal(mask, [True, True, False])
+    thick = get_thickness("d * 2", fields, datums, datum_cache=cache)
+    np.testing.assert_array_almost_equal(thick, [2.0, 2.0, 2.0])
+
+
+def test_interpolate_datums_shared_base():
+    datums = {
+        "a": {"base": "r", "values": [[1, 0.3], [0, 0.2], [2, 0.1], [2, 0.4]]},
+        "b": {"base": "r", "values": [[0.25, 1], [0.75, 2], [0.75, -1], [1.5, 3]]},
+        "c": {"base": "r", "values": [[0.6, 7]]},
+        "d": {"base": "r", "values": [[0, 1], [1, 2]]},
+        "e": {"base": "r", "values": [[0, 0], [0.5, 1], [2, 3]]},
+    }
+    x = np.concatenate([np.linspace(-1, 3, 41), [0.25, 0.6, 0.75, 1.5, np.nan]])
+    cache = interpolate_datums(list(datums), datums, {"r": x})
+    for name, datum in datums.items():
+        expected = eval_datum_lut(build_datum_lut(datum["values"]), x)
+        np.testing.assert_array_equal(cache[name], expected)
+    # Datums without repeated knots match np.interp, including past the ends
+    finite = np.isfinite(x)
+    for name in ("c", "d", "e"):
+        xs, ys = np.array(datums[name]["values"]).T
+        np.testing.assert_allclose(cache[name][finite], np.interp(x[finite], xs, ys))
+
+
 def test_get_thickness_invalid():
-    df = pd.DataFrame({"x": [0.0]})
+    fields = {"x": np.array([0.0])}
     with pytest.raises(ValueError):
-        get_thickness([], df, {})
+        get_thickness([], fields, {})
 
 
 def test_get_datums_from_thickness():
@@ -233,12 +403,17 @@ def test_assign_plies():
 
         assert "ply_000001_plate_100_material" in result_grid.cell_data
         assert result_grid.cell_data["ply_000001_plate_100_material"][0] == 1
+        assert result_grid.cell_data["ply_000001_plate_100_material"].dtype == np.int16
+        assert result_grid.cell_data["ply_000001_plate_100_angle"].dtype == np.float32
         assert "total_thickness" in result_grid.cell_data
         assert result_grid.cell_data["total_thickness"][0] == 0.001
         assert "n_plies" in result_grid.cell_data
         assert result_grid.cell_data["n_plies"][0] == 1
+        assert result_grid.cell_data["n_plies"].dtype == np.uint16
         assert "plate_thickness" in result_grid.cell_data
         assert result_grid.cell_data["plate_thickness"][0] == 0.001
+        with open(output_path, "rb") as f:
+            assert b"vtkLZ4DataCompressor" in f.read()
 
 
 def test_assign_plies_missing_material():
@@ -272,3 +447,280 @@ def test_assign_plies_missing_material():
 
         with pytest.raises(ValueError):
             assign_plies(config, grid_path, matdb_path, output_path)
+
+
+def test_assign_plies_material_id_out_of_range():
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]])
+    cells = np.array([4, 0, 1, 2, 3])
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD], points)
+    grid.cell_data["x"] = np.array([0.5])
+
+    config = Config(
+        plies=[
+            Ply(
+                mat="carbon",
+                angle=0,
+                thickness=0.001,
+                parent="plate",
+                conditions=[],
+                key=100,
+            )
+        ]
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        output_path = os.path.join(tmpdir, "output.vtu")
+        grid.save(grid_path)
+
+        with pytest.raises(ValueError, match="do not fit"):
+            assign_plies(config, grid_path, {"carbon": {"id": 40000}}, output_path)
+
+
+def test_assign_plies_partial_mask():
+    points = np.array(
+        [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0], [2, 0, 0], [2, 1, 0]]
+    )
+    cells = np.array([4, 0, 1, 3, 2, 4, 1, 4, 5, 3])
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD] * 2, points)
+    grid.cell_data["x"] = np.array([0.5, 1.5])
+    grid.point_data["unused"] = np.arange(6.0)
+
+    config = Config(
+        plies=[
+            Ply(
+                mat="carbon",
+                angle=45,
+                thickness=0.002,
+                parent="plate",
+                conditions=[Condition(field="x", operator="in_range", operand=[0, 1])],
+                key=100,
+            )
+        ]
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        output_path = os.path.join(tmpdir, "output.vtu")
+        grid.save(grid_path)
+
+        result_grid = assign_plies(
+            config, grid_path, {"carbon": {"id": 1}}, output_path
+        )
+
+        prefix = "ply_000001_plate_100"
+        np.testing.assert_array_equal(
+            result_grid.cell_data[f"{prefix}_material"], [1, -1]
+        )
+        np.testing.assert_array_almost_equal(
+            result_grid.cell_data[f"{prefix}_angle"], [45, 0]
+        )
+        np.testing.assert_array_almost_equal(
+            result_grid.cell_data[f"{prefix}_thickness"], [0.002, 0]
+        )
+        np.testing.assert_array_equal(result_grid.cell_data["n_plies"], [1, 0])
+        assert "unused" not in result_grid.cell_data
+        assert "unused" in result_grid.point_data
+
+
+def test_assign_plies_uniform_masks():
+    points = np.array(
+        [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0], [2, 0, 0], [2, 1, 0]]
+    )
+    cells = np.array([4, 0, 1, 3, 2, 4, 1, 4, 5, 3])
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD] * 2, points)
+    grid.cell_data["x"] = np.array([0.5, 1.5])
+
+    def ply(parent, key, operand):
+        return Ply(
+            mat="carbon",
+            angle=30,
+            thickness=0.001,
+            parent=parent,
+            conditions=[Condition(field="x", operator="<", operand=operand)],
+            key=key,
+        )
+
+    config = Config(plies=[ply("skin", 100, 2.0), ply("web", 101, 0.0)])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        output_path = os.path.join(tmpdir, "output.vtu")
+        grid.save(grid_path)
+
+        assign_plies(config, grid_path, {"carbon": {"id": 1}}, output_path)
+        result_grid = pv.read(output_path)
+
+        full = "ply_000001_skin_100"
+        np.testing.assert_array_equal(result_grid.cell_data[f"{full}_material"], 1)
+        np.testing.assert_array_almost_equal(result_grid.cell_data[f"{full}_angle"], 30)
+        assert "ply_000002_web_101_material" not in result_grid.cell_data
+        assert list(result_grid.field_data["empty_plies"]) == ["ply_000002_web_101"]
+        np.testing.assert_array_equal(result_grid.cell_data["web_thickness"], 0)
+
+
+def test_assign_plies_sparse_mask():
+    grid = pv.ImageData(dimensions=(41, 2, 1)).cast_to_unstructured_grid()
+    grid.cell_data["x"] = np.arange(40.0)
+
+    config = Config(
+        plies=[
+            Ply(
+                mat="carbon",
+                angle=15,
+                thickness=0.001,
+                parent="plate",
+                conditions=[Condition(field="x", operator="in_range", operand=lo)],
+                key=100 + i,
+            )
+            for i, lo in enumerate([[3, 3], [0, 19]])
+        ]
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        output_path = os.path.join(tmpdir, "output.vtu")
+        grid.save(grid_path)
+
+        result_grid = assign_plies(
+            config, grid_path, {"carbon": {"id": 1}}, output_path
+        )
+
+        x = np.arange(40)
+        for prefix, covered in [
+            ("ply_000001_plate_100", x == 3),
+            ("ply_000002_plate_101", x < 20),
+        ]:
+            np.testing.assert_array_equal(
+                result_grid.cell_data[f"{prefix}_material"], np.where(covered, 1, -1)
+            )
+            np.testing.assert_array_almost_equal(
+                result_grid.cell_data[f"{prefix}_thickness"],
+                np.where(covered, 0.001, 0),
+            )
+        np.testing.assert_array_equal(
+            result_grid.cell_data["n_plies"], (x == 3).astype(int) + (x < 20)
+        )
+
+
+def test_assign_plies_datum_thickness():
+    points = np.array(
+        [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0], [2, 0, 0], [2, 1, 0]]
+    )
+    cells = np.array([4, 0, 1, 3, 2, 4, 1, 4, 5, 3])
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD] * 2, points)
+    grid.cell_data["x"] = np.array([0.5, 1.5])
+    grid.cell_data["r"] = np.array([0.0, 1.0])
+
+    config = Config(
+        datums={"taper": {"base": "r", "values": [[0, 0.002], [1, 0.001]]}},
+        plies=[
+            Ply(
+                mat="carbon",
+                angle=0,
+                thickness="taper",
+                parent="plate",
+                conditions=[Condition(field="x", operator="<", operand=2.0)],
+                key=100,
+            )
+        ],
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        output_path = os.path.join(tmpdir, "output.vtu")
+        grid.save(grid_path)
+
+        result_grid = assign_plies(
+            config, grid_path, {"carbon": {"id": 1}}, output_path
+        )
+
+        np.testing.assert_array_almost_equal(
+            result_grid.cell_data["total_thickness"], [0.002, 0.001]
+        )
+
+
+def test_assign_plies_numbering():
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]])
+    cells = np.array([4, 0, 1, 3, 2])
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD], points)
+    grid.cell_data["x"] = np.array([0.5])
+
+    def ply(parent, key):
+        return Ply(
+            mat="carbon",
+            angle=0,
+            thickness=0.001,
+            parent=parent,
+            conditions=[Condition(field="x", operator="<", operand=1.0)],
+            key=key,
+        )
+
+    config = Config(plies=[ply("a", 200), ply("b", 100), ply("c", 100)])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        output_path = os.path.join(tmpdir, "output.vtu")
+        grid.save(grid_path)
+
+        result_grid = assign_plies(
+            config, grid_path, {"carbon": {"id": 1}}, output_path
+        )
+
+        materials = [k for k in result_grid.cell_data if k.endswith("_material")]
+        assert materials == [
+            "ply_000001_a_200_material",
+            "ply_000002_b_100_material",
+            "ply_000003_c_100_material",
+        ]
+
+
+def test_assign_plies_shared_conditions():
+    points = np.array([[i, j, 0] for j in range(2) for i in range(5)], dtype=float)
+    cells = np.array([[4, i, i + 1, i + 6, i + 5] for i in range(4)]).ravel()
+    grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD] * 4, points)
+    grid.cell_data["x"] = np.array([0.5, 1.5, 2.5, 3.5])
+
+    def ply(angle, operand):
+        return Ply(
+            mat="carbon",
+            angle=angle,
+            thickness=0.001,
+            parent="shell",
+            conditions=[Condition(field="x", operator="in_range", operand=operand)],
+            key=100,
+        )
+
+    config = Config(
+        plies=[ply(0, [0.0, 2.0]), ply(45, [1.0, 3.0]), ply(90, [0.0, 2.0])]
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid_path = os.path.join(tmpdir, "grid.vtu")
+        output_path = os.path.join(tmpdir, "output.vtu")
+        grid.save(grid_path)
+
+        result_grid = assign_plies(
+            config, grid_path, {"carbon": {"id": 1}}, output_path
+        )
+
+        np.testing.assert_array_equal(
+            result_grid.cell_data["ply_000001_shell_100_material"], [1, 1, -1, -1]
+        )
+        np.testing.assert_array_equal(
+            result_grid.cell_data["ply_000002_shell_100_material"], [-1, 1, 1, -1]
+        )
+        np.testing.assert_array_equal(
+            result_grid.cell_data["ply_000003_shell_100_material"], [1, 1, -1, -1]
+        )
+        np.testing.assert_array_equal(result_grid.cell_data["n_plies"], [2, 3, 1, 0])
+
+
+def test_datum_lut_matches_interp():
+    values = [[1.0, 0.3], [0.0, 0.2], [0.5, 0.5], [2.0, 0.1], [2.0, 0.4]]
+    x = np.linspace(-1, 3, 41)
+    lut = build_datum_lut(values)
+    xs, ys = np.array(sorted(values, key=lambda v: v[0])).T
+    np.testing.assert_allclose(eval_datum_lut(lut, x), np.interp(x, xs, ys))
+    single = build_datum_lut([[1.0, 0.7]])
+    np.testing.assert_allclose(eval_datum_lut(single, x), 0.7)
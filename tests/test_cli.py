@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from unittest.mock import patch
 from b3_drp.cli.cli import drape_command, plot_command
 import pyvista as pv
@@ -6,8 +8,8 @@ import numpy as np
 
 def test_drape_command():
     """Test drape command."""
-    with patch("b3_drp.cli.cli.load_config") as mock_load, patch(
-        "b3_drp.cli.cli.assign_plies"
+    with patch("b3_drp.core.assign.load_config") as mock_load, patch(
+        "b3_drp.core.assign.assign_plies"
     ) as mock_assign:
         mock_load.return_value = None
         mock_assign.return_value = None
@@ -29,8 +31,8 @@ def test_plot_command():
     cells = np.array([4, 0, 1, 2, 3])
     mock_grid = pv.UnstructuredGrid(cells, [pv.CellType.QUAD], points)
     mock_grid.cell_data["total_thickness"] = np.array([0.001])
-    with patch("b3_drp.cli.cli.pv.read") as mock_read, patch(
-        "b3_drp.cli.cli.plot_grid"
+    with patch("pyvista.read") as mock_read, patch(
+        "b3_drp.core.plotting.plot_grid"
     ) as mock_plot:
         mock_read.return_value = mock_grid
         plot_command(
@@ -48,3 +50,12 @@ def test_plot_command():
             y_axis="y",
             output_file="dummy_output",
         )
+
+
+def test_cli_import_is_lazy():
+    """Importing the CLI module does not load pyvista."""
+    code = "import sys, b3_drp.cli.cli; print('pyvista' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
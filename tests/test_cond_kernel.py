@@ -0,0 +1,92 @@
+"""Test the compiled condition kernel."""
+
+import numpy as np
+import pytest
+from b3_drp.core._cond_kernel import Op, apply_ply, write_ply
+from b3_drp.core.assign import compile_conditions, evaluate_conditions
+from b3_drp.core.models import Condition
+
+
+def test_compile_conditions():
+    datums = {"d": {"base": "x", "values": [[1, 0.5], [0, 0.2]]}}
+    index = {"x": 0, "y": 1}
+    conditions = [
+        Condition(field="x", operator="in_range", operand=[0, 1]),
+        Condition(field="y", operator=">", operand="d"),
+    ]
+    arrays = compile_conditions(conditions, datums, index)
+    np.testing.assert_array_equal(arrays.op, [Op.IN_RANGE, Op.GT_DATUM])
+    np.testing.assert_array_equal(arrays.field_idx, [0, 1])
+    assert arrays.base_idx[1] == 0
+    np.testing.assert_array_equal(arrays.knot_x, [0, 1])
+    np.testing.assert_array_equal(arrays.knot_y, [0.2, 0.5])
+
+
+def test_compile_conditions_missing_datum():
+    conditions = [Condition(field="x", operator=">", operand="missing")]
+    with pytest.raises(ValueError):
+        compile_conditions(conditions, {}, {"x": 0})
+
+
+def test_apply_ply_matches_numpy():
+    rng = np.random.default_rng(0)
+    block = rng.uniform(-1, 2, size=(2, 200))
+    fields = {"x": block[0], "y": block[1]}
+    index = {"x": 0, "y": 1}
+    datums = {"d": {"base": "x", "values": [[0, 0.2], [0.5, 0.3], [1, 0.4]]}}
+    conditions = [
+        Condition(field="x", operator="in_range", operand=[0, 1]),
+        Condition(field="y", operator=">", operand="d"),
+        Condition(field="y", operator="<", operand=1.5),
+    ]
+    expected = evaluate_conditions(fields, conditions, datums)
+    mask = np.empty(block.shape[1], dtype=bool)
+    apply_ply(block, *compile_conditions(conditions, datums, index), mask)
+    np.testing.assert_array_equal(mask, expected)
+
+    # Float32 values on the thresholds compare as float32, also when the
+    # block widened them to float64
+    x = np.array([0.1, 0.2, 0.3, 0.4, 0.5], dtype=np.float32)
+    conditions = [
+        Condition(field="x", operator="in_range", operand=[0.2, 0.4]),
+        Condition(field="x", operator=">", operand=0.2),
+    ]
+    expected = evaluate_conditions({"x": x}, conditions, {})
+    np.testing.assert_array_equal(expected, [False, False, True, True, False])
+    arrays = compile_conditions(conditions, {}, {"x": 0}, {"x": x.dtype})
+    for block in (x[None, :], x[None, :].astype(np.float64)):
+        mask = np.empty(len(x), dtype=bool)
+        apply_ply(block, *arrays, mask)
+        np.testing.assert_array_equal(mask, expected)
+
+
+def test_write_ply():
+    mask = np.array([True, False, True, True])
+    total = np.full(4, 0.5, dtype=np.float32)
+    n_plies = np.array([1, 0, 0, 2], dtype=np.int32)
+    parent = np.zeros(4, dtype=np.float32)
+    for thickness in (np.array([0.25]), np.array([0.1, 0.2, 0.3, 0.4])):
+        material = np.empty(4, dtype=np.int16)
+        angle = np.empty(4, dtype=np.float32)
+        ply_thickness = np.empty(4, dtype=np.float32)
+        expected_total = total + np.where(mask, thickness, 0).astype(np.float32)
+        write_ply(
+            mask,
+            thickness,
+            3,
+            45.0,
+            material,
+            angle,
+            ply_thickness,
+            total,
+            n_plies,
+            parent,
+        )
+        np.testing.assert_array_equal(material, [3, -1, 3, 3])
+        np.testing.assert_array_equal(angle, [45, 0, 45, 45])
+        np.testing.assert_allclose(
+            ply_thickness, np.where(mask, thickness, 0), rtol=1e-6
+        )
+        np.testing.assert_allclose(total, expected_total, rtol=1e-6)
+    np.testing.assert_array_equal(n_plies, [3, 0, 2, 4])
+    np.testing.assert_allclose(parent, [0.35, 0, 0.55, 0.65], rtol=1e-6)
@@ -40,7 +40,8 @@ def test_drape_step():
 
         # Write config
         with open(config_path, "w") as f:
-            yaml.dump(config_data, f)
+            dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+            yaml.dump(config_data, f, Dumper=dumper)
 
         # Write matdb
         with open(matdb_path, "w") as f:
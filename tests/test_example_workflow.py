@@ -1,88 +1,141 @@
-"""Test example workflow."""
+"""Test the example workflows."""
 
-import tempfile
-import os
 import numpy as np
-import pyvista as pv
-import yaml
-import json
-from b3_drp.core.assign import assign_plies, load_config
-from b3_drp.core.plotting import plot_grid
-
-
-def test_example_workflow():
-    """Test the workflow example."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create a 20x20 square mesh in [0,1]
-        x = np.linspace(0, 1, 21)
-        y = np.linspace(0, 1, 21)
-        X, Y = np.meshgrid(x, y)
-        points = np.column_stack([X.ravel(), Y.ravel(), np.zeros_like(X.ravel())])
-
-        # Create structured grid
-        mesh = pv.StructuredGrid()
-        mesh.points = points
-        mesh.dimensions = [21, 21, 1]
-
-        # Compute cell centers for x, y
-        cell_centers = mesh.cell_centers()
-        mesh.cell_data["x"] = cell_centers.points[:, 0]
-        mesh.cell_data["y"] = cell_centers.points[:, 1]
-
-        # Convert to unstructured grid for .vtu saving
-        mesh = mesh.cast_to_unstructured_grid()
-
-        grid_path = os.path.join(tmpdir, "input_mesh.vtu")
-        mesh.save(grid_path)
-
-        # Create config.yaml
-        config_data = {
-            "plies": [
-                {
-                    "mat": "carbon",
-                    "angle": 0,
-                    "thickness": 0.001,
-                    "parent": "plate",
-                    "conditions": [
-                        {"field": "x", "operator": "in_range", "operand": [0, 1]},
-                        {"field": "y", "operator": "in_range", "operand": [0, 1]},
-                    ],
-                    "key": 100,
-                },
-                {
-                    "mat": "glass",
-                    "angle": 45,
-                    "thickness": 0.0005,
-                    "parent": "plate",
-                    "conditions": [
-                        {"field": "x", "operator": "in_range", "operand": [0.4, 0.6]},
-                        {"field": "y", "operator": "in_range", "operand": [0.4, 0.6]},
-                    ],
-                    "key": 101,
-                },
-            ],
-        }
-        config_path = os.path.join(tmpdir, "config.yaml")
-        with open(config_path, "w") as f:
-            yaml.dump(config_data, f)
-
-        # Create matdb.json
-        matdb_path = os.path.join(tmpdir, "matdb.json")
-        with open(matdb_path, "w") as f:
-            json.dump({"carbon": {"id": 1}, "glass": {"id": 2}}, f)
-
-        # Load config and assign
-        config = load_config(config_path)
-        output_path = os.path.join(tmpdir, "output_mesh.vtu")
-        result_grid = assign_plies(config, grid_path, matdb_path, output_path)
-
-        # Check results
-        assert "total_thickness" in result_grid.cell_data
-        assert result_grid.cell_data["total_thickness"].sum() > 0
-
-        # Plot
-        plot_path = os.path.join(tmpdir, "workflow_plot.png")
-        plot_grid(result_grid, scalar="total_thickness", output_file=plot_path)
-
-        if not ("CI" in os.environ or "GITHUB_ACTIONS" in os.environ):
-            assert os.path.exists(plot_path)
+import pytest
+from b3_drp.core.assign import assign_plies
+from b3_drp.core.models import Config, Datum, Ply, Condition
+
+MATDB = {"carbon": {"id": 1}, "glass": {"id": 2}}
+
+
+def _workflow_case(quad_mesh):
+    """Two plies on a 20x20 square mesh in [0,1], as in config.yaml."""
+    mesh = quad_mesh(np.linspace(0, 1, 21), np.linspace(0, 1, 21))
+    config_data = {
+        "plies": [
+            {
+                "mat": "carbon",
+                "angle": 0,
+                "thickness": 0.001,
+                "parent": "plate",
+                "conditions": [
+                    {"field": "x", "operator": "in_range", "operand": [0, 1]},
+                    {"field": "y", "operator": "in_range", "operand": [0, 1]},
+                ],
+                "key": 100,
+            },
+            {
+                "mat": "glass",
+                "angle": 45,
+                "thickness": 0.0005,
+                "parent": "plate",
+                "conditions": [
+                    {"field": "x", "operator": "in_range", "operand": [0.4, 0.6]},
+                    {"field": "y", "operator": "in_range", "operand": [0.4, 0.6]},
+                ],
+                "key": 101,
+            },
+        ],
+    }
+    return mesh, Config(**config_data)
+
+
+def _quad_workflow_case(quad_mesh):
+    """A tapered ply on a 50x50 z = x**2 surface, as in config_quad.yaml."""
+    n = 51
+    mesh = quad_mesh(
+        np.linspace(0, 1, n), np.linspace(0, 5, n), surface=lambda x, y: x**2
+    )
+    config_data = {
+        "plies": [
+            {
+                "mat": "glass",
+                "angle": 0,
+                "thickness": "thickness_taper",
+                "parent": "plate",
+                "conditions": [
+                    {"field": "x", "operator": "in_range", "operand": [0, 1]},
+                    {"field": "y", "operator": "in_range", "operand": [0, 5]},
+                ],
+                "key": 100,
+            }
+        ],
+        "datums": {
+            "thickness_taper": {
+                "base": "y",
+                "values": [[0, 0.001], [2.5, 0.002], [5, 0.001]],
+            }
+        },
+    }
+    return mesh, Config(**config_data)
+
+
+def _programmatic_case(quad_mesh):
+    """Blade plies built from model objects, as in programmatic_example.py."""
+    # Define datums
+    te_offset = Datum(base="r", values=[[0, 0], [20, 0.1], [40, 0.2]])
+
+    # Define plies
+    ply1 = Ply(
+        mat="carbon",
+        angle=45,
+        thickness=0.45e-3,
+        parent="sparcap",
+        conditions=[
+            Condition(field="r", operator="in_range", operand=[10, 20]),
+            Condition(field="distance_from_te", operator=">", operand=0.1),
+            Condition(field="distance_from_le", operator=">", operand=1),
+        ],
+        key=100,
+    )
+    ply2 = Ply(
+        mat="glass",
+        angle=0,
+        thickness=1.2e-3,
+        parent="allover",
+        conditions=[
+            Condition(field="r", operator="in_range", operand=[15, 25]),
+            Condition(field="distance_from_te", operator=">", operand="te_offset"),
+            Condition(field="distance_from_le", operator=">", operand=0.5),
+            Condition(field="distance_from_web0", operator="<", operand=0.6),
+        ],
+        key=102,
+    )
+
+    config = Config(datums={"te_offset": te_offset}, plies=[ply1, ply2])
+
+    # Create a 10x10 square mesh in [0,1]
+    mesh = quad_mesh(np.linspace(0, 1, 11), np.linspace(0, 1, 11))
+
+    # Add required fields (mock, constant for simplicity); pyvista copies the
+    # broadcast views into its own arrays on assignment
+    shape = (mesh.n_cells,)
+    mesh.cell_data["r"] = np.broadcast_to(15.0, shape)
+    mesh.cell_data["distance_from_le"] = np.broadcast_to(2.0, shape)
+    mesh.cell_data["distance_from_te"] = np.broadcast_to(0.2, shape)
+    mesh.cell_data["distance_from_web0"] = np.broadcast_to(0.5, shape)
+    return mesh, config
+
+
+@pytest.mark.parametrize(
+    "case",
+    [_workflow_case, _quad_workflow_case, _programmatic_case],
+    ids=["workflow", "quad_workflow", "programmatic"],
+)
+def test_example_workflow(case, quad_mesh, plot_grid, tmp_path):
+    """Assign plies for an example and plot the total thickness."""
+    mesh, config = case(quad_mesh)
+
+    # Assign
+    output_path = tmp_path / "output.vts"
+    result_grid = assign_plies(config, mesh, MATDB, output_path)
+
+    # Check results
+    assert "total_thickness" in result_grid.cell_data
+    assert result_grid.cell_data["total_thickness"].sum() > 0
+    assert "total_thickness" not in mesh.cell_data
+
+    # Plot
+    plot_path = tmp_path / "plot.png"
+    plot_grid(result_grid, scalar="total_thickness", output_file=plot_path)
+    assert plot_path.is_file()